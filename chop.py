@@ -3,11 +3,26 @@ import time
 import sys
 
 def print_slowly(text, delay=0.01):
-    """Prints text one character at a time to be human-readable."""
-    for char in text:
-        sys.stdout.write(char)
+    """
+    Prints text one word at a time to be human-readable.
+    Each word is written and flushed in one go, then we sleep for
+    `delay` per character so the overall pace stays the same.
+    When stdout is not a terminal the text is printed in one go.
+    """
+    # Piped or redirected output has nobody watching it scroll, so skip
+    # the per-word flush and sleep entirely
+    if not sys.stdout.isatty():
+        print(text)
+        return
+
+    chunks = text.split(' ')
+    last = len(chunks) - 1
+    for i, chunk in enumerate(chunks):
+        if i < last:
+            chunk += ' '
+        sys.stdout.write(chunk)
         sys.stdout.flush()
-        time.sleep(delay)
+        time.sleep(delay * len(chunk))
     # The text already contains newlines, so we don't add another
     # print() here, but we will print one final newline after all lines.
     print() 
@@ -30,10 +45,17 @@ def randomly_reduce_and_lineate_text(text, percentage_to_keep):
     min_words_per_line = 3  # Approximating a short poetic line
     max_words_per_line = 7  # Approximating a longer poetic line
     
+    # Draw every line length up front in one call. Lines are at least
+    # min_words_per_line long, so this many is always enough.
+    line_lengths = random.choices(
+        range(min_words_per_line, max_words_per_line + 1),
+        k=len(sampled_words) // min_words_per_line + 1,
+    )
+    
     i = 0
-    while i < len(sampled_words):
-        # Determine a random length for this line
-        line_length = random.randint(min_words_per_line, max_words_per_line)
+    for line_length in line_lengths:
+        if i >= len(sampled_words):
+            break
         
         # Get the slice of words for this line (e.g., words[0:5])
         line_words = sampled_words[i : i + line_length]
@@ -2,7 +2,9 @@ import random
 import time
 import sys
 import argparse
+import io
 import re
+from functools import lru_cache
 
 # --- Constants for Configuration ---
 
@@ -27,50 +29,116 @@ SHORT_TEXT_MAX_KEEP = 0.30  # (70% reduction)
 LONG_TEXT_MIN_KEEP = 0.01   # (99% reduction)
 LONG_TEXT_MAX_KEEP = 0.10   # (90% reduction)
 
+# Pre-computed terms for the length bias (see the main block)
+_LEN_SCALE = 1.0 / (REFERENCE_LONG_LENGTH - REFERENCE_SHORT_LENGTH)
+_MIN_DELTA = LONG_TEXT_MIN_KEEP - SHORT_TEXT_MIN_KEEP
+_MAX_DELTA = LONG_TEXT_MAX_KEEP - SHORT_TEXT_MAX_KEEP
+
+
+_CLEAN_KEEP = 'abcdefghijklmnopqrstuvwxyz0123456789'
+
+
+class _CleanTable(dict):
+    """
+    str.translate() table for clean_text: lowercases A-Z, keeps a-z, 0-9
+    and whitespace, deletes everything else. Characters not listed up
+    front are classified on first lookup and cached. Non-ASCII whitespace
+    becomes a plain space, so every value is ASCII.
+    """
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        if char.isspace():
+            value = codepoint if codepoint < 0x80 else 0x20
+        else:
+            # Same result as lower() followed by stripping; a few non-ASCII
+            # letters lowercase to ASCII ones (e.g. the Kelvin sign -> 'k')
+            value = ''.join(c for c in char.lower() if c in _CLEAN_KEEP) or None
+        self[codepoint] = value
+        return value
+
+
+_CLEAN_TABLE = _CleanTable({ord(c): ord(c) for c in _CLEAN_KEEP})
+_CLEAN_TABLE.update({ord(c.upper()): ord(c) for c in _CLEAN_KEEP if c.isalpha()})
+
+# Runs of non-ASCII characters, cleaned separately by clean_text
+_NON_ASCII_RUN = re.compile(r'[^\x00-\x7f]+')
+
+# Lookup table indexed by byte value: 1 for a vowel (aeiouy), 0 otherwise
+_VOWEL_MASK = bytes(1 if c in b'aeiouy' else 0 for c in range(256))
+
+# Output buffer reused by randomly_reduce_and_lineate_text so repeated calls
+# don't allocate a new one each time (not thread-safe)
+_BUF = io.StringIO()
+
 
 def clean_text(text):
     """
     Converts text to lowercase and removes all special characters.
     Keeps only letters, numbers, and whitespace.
     """
-    text = text.lower()
-    text = re.sub(r'[^a-z0-9\s]', '', text) # Keep only letters, numbers, space
-    text = re.sub(r'\s+', ' ', text).strip() # Collapse multiple spaces
-    return text
+    # str.translate() only takes its fast path on pure-ASCII strings, and
+    # a few curly quotes or dashes would push the whole text off it, so
+    # clean the non-ASCII runs on their own first (they come out ASCII)
+    if not text.isascii():
+        text = _NON_ASCII_RUN.sub(lambda m: m.group().translate(_CLEAN_TABLE), text)
+    # Lowercase and drop anything that is not a-z, 0-9 or whitespace in
+    # one pass, then collapse whitespace runs (split/join also strips)
+    return ' '.join(text.translate(_CLEAN_TABLE).split())
 
 
 def print_slowly(text, delay=PRINT_DELAY):
-    """Prints text one character at a time to be human-readable."""
-    for char in text:
-        sys.stdout.write(char)
+    """
+    Prints text one word at a time to be human-readable.
+    Each word is written and flushed in one go, then we sleep for
+    `delay` per character so the overall pace stays the same.
+    When stdout is not a terminal the text is printed in one go.
+    """
+    # Piped or redirected output has nobody watching it scroll, so skip
+    # the per-word flush and sleep entirely
+    if not sys.stdout.isatty():
+        print(text)
+        return
+
+    chunks = text.split(' ')
+    last = len(chunks) - 1
+    for i, chunk in enumerate(chunks):
+        if i < last:
+            chunk += ' '
+        sys.stdout.write(chunk)
         sys.stdout.flush()
-        time.sleep(delay)
+        time.sleep(delay * len(chunk))
     print()
 
 
+@lru_cache(maxsize=65536)
 def estimate_syllables(word):
     """
     Estimates the number of syllables in a single word using a
     simple rule-based (heuristic) approach.
     """
-    word = word.lower().strip()
-    
-    if not word or not re.search(r'[a-z]', word):
+    word = word.lower().strip().encode('ascii', 'ignore')
+
+    # bytes.islower() is only True if there is at least one a-z letter
+    if not word.islower():
         return 0
-        
     if len(word) <= 3:
         return 1
-        
-    if word.endswith('e'):
-        if not (word.endswith('le') and re.search(r'[^aeiouy]le$', word)):
+
+    # Drop a silent 'e' (0x65) unless the word ends in consonant + 'le' (0x6c)
+    if word[-1] == 0x65:
+        if not (word[-2] == 0x6c and not _VOWEL_MASK[word[-3]]):
             word = word[:-1]
 
-    vowel_groups = re.findall(r'[aeiouy]+', word)
-    count = len(vowel_groups)
-    
+    # Count non-vowel -> vowel transitions, one per vowel group
+    count = 0
+    prev = 0
+    for c in word:
+        v = _VOWEL_MASK[c]
+        count += v & ~prev
+        prev = v
+
     if count == 0:
         return 1
-        
     return count
 
 
@@ -78,6 +146,7 @@ def randomly_reduce_and_lineate_text(text, percentage_to_keep):
     """
     Reduces text by sampling words and formats them into
     lines based on a target syllable count.
+    Not thread-safe: the output is built in a shared buffer.
     """
     words = text.split()
 
@@ -91,32 +160,34 @@ def randomly_reduce_and_lineate_text(text, percentage_to_keep):
     sampled_words = random.sample(words, k)
     
     # --- This is your implemented logic ---
-    all_lines = []
-    current_line_words = []
-    current_line_syllables = 0
-    
-    for word in sampled_words:
-        word_syllables = estimate_syllables(word)
+    # Words and separators are streamed into the shared _BUF,
+    # emptied first so it can be reused between calls
+    buf = _BUF
+    buf.seek(0)
+    buf.truncate(0)
+    write = buf.write
     
+    # Count syllables for all sampled words in one bulk map()
+    syllable_counts = map(estimate_syllables, sampled_words)
+    pairs = zip(sampled_words, syllable_counts)
+    # The first word always opens the first line, so it is written before
+    # the loop and the loop never has to check for an empty buffer
+    word, current_line_syllables = next(pairs)
+    write(word)
+    for word, word_syllables in pairs:
         # Check if adding this word goes OVER the target
         if (current_line_syllables + word_syllables > TARGET_SYLLABLES_PER_LINE) and (current_line_syllables > 0):
-            # Finalize the current line
-            all_lines.append(' '.join(current_line_words))
-            
-            # Start a new line with the current word
-            current_line_words = [word]
+            # Finalize the current line and start a new one
+            write('\n')
             current_line_syllables = word_syllables
         else:
-            # If it doesn't go over, just add the word
-            current_line_words.append(word)
+            # If it doesn't go over, stay on the same line
+            write(' ')
             current_line_syllables += word_syllables
-    
-    # After the loop, add the last remaining line
-    if current_line_words:
-         all_lines.append(' '.join(current_line_words))
+        write(word)
     
     # Return the final result
-    return '\n'.join(all_lines)
+    return buf.getvalue()
     # --- End of your logic ---
 
 
@@ -154,16 +225,11 @@ if __name__ == "__main__":
     time.sleep(1)  # Shorter pause
 
     # 5. Calculate biased reduction based on text length
-    normalized_length = (text_length - REFERENCE_SHORT_LENGTH) / \
-                        (REFERENCE_LONG_LENGTH - REFERENCE_SHORT_LENGTH)
-    
+    normalized_length = (text_length - REFERENCE_SHORT_LENGTH) * _LEN_SCALE
     length_factor = max(0.0, min(1.0, normalized_length)) # Clamp between 0.0 and 1.0
 
-    current_min_keep = (SHORT_TEXT_MIN_KEEP * (1 - length_factor)) + \
-                       (LONG_TEXT_MIN_KEEP * length_factor)
-                       
-    current_max_keep = (SHORT_TEXT_MAX_KEEP * (1 - length_factor)) + \
-                       (LONG_TEXT_MAX_KEEP * length_factor)
+    current_min_keep = SHORT_TEXT_MIN_KEEP + length_factor * _MIN_DELTA
+    current_max_keep = SHORT_TEXT_MAX_KEEP + length_factor * _MAX_DELTA
     
     # 6. Pick a random percentage from within the new biased range
     random_keep_percentage = random.uniform(current_min_keep, current_max_keep)
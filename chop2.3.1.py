@@ -2,9 +2,12 @@ import random
 import time
 import sys
 import argparse
-import re
+import asyncio
+import io
 import uuid
 import os  # <-- Added for API key
+import re
+from functools import lru_cache
 import google.generativeai as genai  # <-- Added for API
 
 # --- Constants for Configuration ---
@@ -16,71 +19,211 @@ SHORT_TEXT_MIN_KEEP = 0.15
 SHORT_TEXT_MAX_KEEP = 0.30
 LONG_TEXT_MIN_KEEP = 0.01
 LONG_TEXT_MAX_KEEP = 0.10
+SPELLCHECK_CHUNK_CHARS = 8000  # Paragraphs are packed into API requests of about this size
+SPELLCHECK_MAX_CONCURRENCY = 4  # API requests in flight at once, to stay under the rate limit
 
+# Pre-computed terms for the length bias (see the main block)
+_LEN_SCALE = 1.0 / (REFERENCE_LONG_LENGTH - REFERENCE_SHORT_LENGTH)
+_MIN_DELTA = LONG_TEXT_MIN_KEEP - SHORT_TEXT_MIN_KEEP
+_MAX_DELTA = LONG_TEXT_MAX_KEEP - SHORT_TEXT_MAX_KEEP
 
-def autocorrect_text_api(text_to_correct, api_model):
+
+_CLEAN_KEEP = 'abcdefghijklmnopqrstuvwxyz0123456789'
+
+
+class _CleanTable(dict):
     """
-    Uses the Gemini API to correct spelling and grammar.
+    str.translate() table for clean_text: lowercases A-Z, keeps a-z, 0-9
+    and whitespace, deletes everything else. Characters not listed up
+    front are classified on first lookup and cached. Non-ASCII whitespace
+    becomes a plain space, so every value is ASCII.
     """
-    print("...Sending text to API for spellchecking (this may take a moment)...")
-    
-    # This is the prompt we send to the AI
-    prompt = f"""
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        if char.isspace():
+            value = codepoint if codepoint < 0x80 else 0x20
+        else:
+            # Same result as lower() followed by stripping; a few non-ASCII
+            # letters lowercase to ASCII ones (e.g. the Kelvin sign -> 'k')
+            value = ''.join(c for c in char.lower() if c in _CLEAN_KEEP) or None
+        self[codepoint] = value
+        return value
+
+
+_CLEAN_TABLE = _CleanTable({ord(c): ord(c) for c in _CLEAN_KEEP})
+_CLEAN_TABLE.update({ord(c.upper()): ord(c) for c in _CLEAN_KEEP if c.isalpha()})
+
+# Runs of non-ASCII characters, cleaned separately by clean_text
+_NON_ASCII_RUN = re.compile(r'[^\x00-\x7f]+')
+
+# Lookup table indexed by byte value: 1 for a vowel (aeiouy), 0 otherwise
+_VOWEL_MASK = bytes(1 if c in b'aeiouy' else 0 for c in range(256))
+
+# Output buffer reused by randomly_reduce_and_lineate_text so repeated calls
+# don't allocate a new one each time (not thread-safe)
+_BUF = io.StringIO()
+
+
+# Configured Gemini model, created on first use and reused afterwards
+_MODEL = None
+
+
+def _get_model(api_key):
+    """
+    Configures the Gemini API and returns the spellcheck model.
+    Only the first call pays the setup cost; later calls reuse it.
+    """
+    global _MODEL
+    if _MODEL is None:
+        genai.configure(api_key=api_key)
+        _MODEL = genai.GenerativeModel('gemini-pro')
+    return _MODEL
+
+
+def split_into_paragraph_chunks(text, max_chars=SPELLCHECK_CHUNK_CHARS):
+    """
+    Splits text on blank lines and packs the paragraphs into chunks of
+    at most max_chars. A single paragraph longer than that is kept whole.
+    """
+    chunks = []
+    current = []
+    current_length = 0
+    for paragraph in text.split('\n\n'):
+        if current and current_length + len(paragraph) > max_chars:
+            chunks.append('\n\n'.join(current))
+            current = []
+            current_length = 0
+        current.append(paragraph)
+        current_length += len(paragraph) + 2
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+async def _autocorrect_chunks(chunks, api_model):
+    """
+    Sends the chunks to the API concurrently, at most
+    SPELLCHECK_MAX_CONCURRENCY at a time, and returns the corrected
+    chunks in order. A chunk that fails is kept as-is.
+    """
+    semaphore = asyncio.Semaphore(SPELLCHECK_MAX_CONCURRENCY)
+
+    async def correct(chunk, prompt):
+        # Blank chunks (from runs of empty lines) have nothing to correct
+        # and would only get commentary back, so they are not sent
+        if not chunk.strip():
+            return None
+        async with semaphore:
+            return await api_model.generate_content_async(prompt)
+
+    # This is the prompt we send to the AI for each chunk
+    prompts = [f"""
     Please correct the spelling and grammar of the following text.
     Only return the corrected text. Do not add any commentary, preamble, or explanations.
     Just return the corrected text.
 
     ---
-    {text_to_correct}
+    {chunk}
     ---
+    """ for chunk in chunks]
+
+    responses = await asyncio.gather(
+        *(correct(chunk, prompt) for chunk, prompt in zip(chunks, prompts)),
+        return_exceptions=True,
+    )
+
+    corrected = []
+    for chunk, response in zip(chunks, responses):
+        if response is None:
+            corrected.append(chunk)
+            continue
+        try:
+            if isinstance(response, Exception):
+                raise response
+            corrected.append(response.text.strip())
+        except Exception as e:
+            print(f"\n--- API Error ---\n{e}\n---")
+            print("Keeping original text for this section due to API error.")
+            corrected.append(chunk)
+    return corrected
+
+
+def autocorrect_text_api(text_to_correct, api_model):
     """
-    
-    try:
-        response = api_model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        print(f"\n--- API Error ---\n{e}\n---")
-        print("Returning original text due to API error.")
-        return text_to_correct
+    Uses the Gemini API to correct spelling and grammar.
+    Long texts are split into paragraph chunks that are corrected in
+    parallel, so the request latencies overlap instead of adding up.
+    """
+    print("...Sending text to API for spellchecking (this may take a moment)...")
+
+    chunks = split_into_paragraph_chunks(text_to_correct)
+    return '\n\n'.join(asyncio.run(_autocorrect_chunks(chunks, api_model)))
 
 
 def clean_text(text):
     """
     Converts text to lowercase and removes all special characters.
     """
-    text = text.lower()
-    text = re.sub(r'[^a-z0-9\s]', '', text) # Keep only letters, numbers, space
-    text = re.sub(r'\s+', ' ', text).strip() # Collapse multiple spaces
-    return text
+    # str.translate() only takes its fast path on pure-ASCII strings, and
+    # a few curly quotes or dashes would push the whole text off it, so
+    # clean the non-ASCII runs on their own first (they come out ASCII)
+    if not text.isascii():
+        text = _NON_ASCII_RUN.sub(lambda m: m.group().translate(_CLEAN_TABLE), text)
+    # Lowercase and drop anything that is not a-z, 0-9 or whitespace in
+    # one pass, then collapse whitespace runs (split/join also strips)
+    return ' '.join(text.translate(_CLEAN_TABLE).split())
 
 
 def print_slowly(text, delay=PRINT_DELAY):
-    """Prints text one character at a time to be human-readable."""
-    for char in text:
-        sys.stdout.write(char)
+    """
+    Prints text one word at a time to be human-readable.
+    Each word is written and flushed in one go, then we sleep for
+    `delay` per character so the overall pace stays the same.
+    When stdout is not a terminal the text is printed in one go.
+    """
+    # Piped or redirected output has nobody watching it scroll, so skip
+    # the per-word flush and sleep entirely
+    if not sys.stdout.isatty():
+        print(text)
+        return
+
+    chunks = text.split(' ')
+    last = len(chunks) - 1
+    for i, chunk in enumerate(chunks):
+        if i < last:
+            chunk += ' '
+        sys.stdout.write(chunk)
         sys.stdout.flush()
-        time.sleep(delay)
+        time.sleep(delay * len(chunk))
     print()
 
 
+@lru_cache(maxsize=65536)
 def estimate_syllABLES(word):
     """
     Estimates the number of syllables in a single word.
     """
-    word = word.lower().strip()
-    
-    if not word or not re.search(r'[a-z]', word):
+    word = word.lower().strip().encode('ascii', 'ignore')
+
+    # bytes.islower() is only True if there is at least one a-z letter
+    if not word.islower():
         return 0
     if len(word) <= 3:
         return 1
-        
-    if word.endswith('e'):
-        if not (word.endswith('le') and re.search(r'[^aeiouy]le$', word)):
+
+    # Drop a silent 'e' (0x65) unless the word ends in consonant + 'le' (0x6c)
+    if word[-1] == 0x65:
+        if not (word[-2] == 0x6c and not _VOWEL_MASK[word[-3]]):
             word = word[:-1]
 
-    vowel_groups = re.findall(r'[aeiouy]+', word)
-    count = len(vowel_groups)
-    
+    # Count non-vowel -> vowel transitions, one per vowel group
+    count = 0
+    prev = 0
+    for c in word:
+        v = _VOWEL_MASK[c]
+        count += v & ~prev
+        prev = v
+
     if count == 0:
         return 1
     return count
@@ -90,6 +233,7 @@ def randomly_reduce_and_lineate_text(text, percentage_to_keep):
     """
     Reduces text by sampling words and formats them into
     lines based on a target syllable count.
+    Not thread-safe: the output is built in a shared buffer.
     """
     words = text.split()
 
@@ -102,25 +246,30 @@ def randomly_reduce_and_lineate_text(text, percentage_to_keep):
 
     sampled_words = random.sample(words, k)
     
-    all_lines = []
-    current_line_words = []
-    current_line_syllables = 0
-    
-    for word in sampled_words:
-        word_syllables = estimate_syllABLES(word)
+    # Words and separators are streamed into the shared _BUF,
+    # emptied first so it can be reused between calls
+    buf = _BUF
+    buf.seek(0)
+    buf.truncate(0)
+    write = buf.write
     
+    # Count syllables for all sampled words in one bulk map()
+    syllable_counts = map(estimate_syllABLES, sampled_words)
+    pairs = zip(sampled_words, syllable_counts)
+    # The first word always opens the first line, so it is written before
+    # the loop and the loop never has to check for an empty buffer
+    word, current_line_syllables = next(pairs)
+    write(word)
+    for word, word_syllables in pairs:
         if (current_line_syllables + word_syllables > TARGET_SYLLABLES_PER_LINE) and (current_line_syllables > 0):
-            all_lines.append(' '.join(current_line_words))
-            current_line_words = [word]
+            write('\n')
             current_line_syllables = word_syllables
         else:
-            current_line_words.append(word)
+            write(' ')
             current_line_syllables += word_syllables
+        write(word)
     
-    if current_line_words:
-         all_lines.append(' '.join(current_line_words))
-    
-    return '\n'.join(all_lines)
+    return buf.getvalue()
 
 
 # --- Main execution ---
@@ -163,8 +312,7 @@ if __name__ == "__main__":
         
         # 2. Configure the API
         try:
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-pro')
+            model = _get_model(api_key)
             
             # 3. Call the API function
             text_to_clean = autocorrect_text_api(original_text, model)
@@ -185,13 +333,9 @@ if __name__ == "__main__":
     time.sleep(1)
 
     # Calculate biased reduction
-    normalized_length = (text_length - REFERENCE_SHORT_LENGTH) / \
-                        (REFERENCE_LONG_LENGTH - REFERENCE_SHORT_LENGTH)
-    length_factor = max(0.0, min(1.0, normalized_length))
-    current_min_keep = (SHORT_TEXT_MIN_KEEP * (1 - length_factor)) + \
-                       (LONG_TEXT_MIN_KEEP * length_factor)
-    current_max_keep = (SHORT_TEXT_MAX_KEEP * (1 - length_factor)) + \
-                       (LONG_TEXT_MAX_KEEP * length_factor)
+    length_factor = max(0.0, min(1.0, (text_length - REFERENCE_SHORT_LENGTH) * _LEN_SCALE))
+    current_min_keep = SHORT_TEXT_MIN_KEEP + length_factor * _MIN_DELTA
+    current_max_keep = SHORT_TEXT_MAX_KEEP + length_factor * _MAX_DELTA
     
     random_keep_percentage = random.uniform(current_min_keep, current_max_keep)
     reduction_percentage = (1 - random_keep_percentage) * 100
@@ -2,7 +2,9 @@ import random
 import time
 import sys
 import argparse
+import io
 import re
+from functools import lru_cache
 # import uuid  <-- No longer needed
 
 # --- Constants for Configuration ---
@@ -28,50 +30,121 @@ SHORT_TEXT_MAX_KEEP = 0.30  # (70% reduction)
 LONG_TEXT_MIN_KEEP = 0.01   # (99% reduction)
 LONG_TEXT_MAX_KEEP = 0.10   # (90% reduction)
 
+# 4. Output: Buffer size used when writing the poem file
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Pre-computed terms for the length bias (see the main block)
+_LEN_SCALE = 1.0 / (REFERENCE_LONG_LENGTH - REFERENCE_SHORT_LENGTH)
+_MIN_DELTA = LONG_TEXT_MIN_KEEP - SHORT_TEXT_MIN_KEEP
+_MAX_DELTA = LONG_TEXT_MAX_KEEP - SHORT_TEXT_MAX_KEEP
+
+
+_CLEAN_KEEP = 'abcdefghijklmnopqrstuvwxyz0123456789'
+
+
+class _CleanTable(dict):
+    """
+    str.translate() table for clean_text: lowercases A-Z, keeps a-z, 0-9
+    and whitespace, deletes everything else. Characters not listed up
+    front are classified on first lookup and cached. Non-ASCII whitespace
+    becomes a plain space, so every value is ASCII.
+    """
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        if char.isspace():
+            value = codepoint if codepoint < 0x80 else 0x20
+        else:
+            # Same result as lower() followed by stripping; a few non-ASCII
+            # letters lowercase to ASCII ones (e.g. the Kelvin sign -> 'k')
+            value = ''.join(c for c in char.lower() if c in _CLEAN_KEEP) or None
+        self[codepoint] = value
+        return value
+
+
+_CLEAN_TABLE = _CleanTable({ord(c): ord(c) for c in _CLEAN_KEEP})
+_CLEAN_TABLE.update({ord(c.upper()): ord(c) for c in _CLEAN_KEEP if c.isalpha()})
+
+# Runs of non-ASCII characters, cleaned separately by clean_text
+_NON_ASCII_RUN = re.compile(r'[^\x00-\x7f]+')
+
+# Lookup table indexed by byte value: 1 for a vowel (aeiouy), 0 otherwise
+_VOWEL_MASK = bytes(1 if c in b'aeiouy' else 0 for c in range(256))
+
+# Output buffer reused by randomly_reduce_and_lineate_text so repeated calls
+# don't allocate a new one each time (not thread-safe)
+_BUF = io.StringIO()
+
 
 def clean_text(text):
     """
     Converts text to lowercase and removes all special characters.
     Keeps only letters, numbers, and whitespace.
     """
-    text = text.lower()
-    text = re.sub(r'[^a-z0-9\s]', '', text) # Keep only letters, numbers, space
-    text = re.sub(r'\s+', ' ', text).strip() # Collapse multiple spaces
-    return text
+    # str.translate() only takes its fast path on pure-ASCII strings, and
+    # a few curly quotes or dashes would push the whole text off it, so
+    # clean the non-ASCII runs on their own first (they come out ASCII)
+    if not text.isascii():
+        text = _NON_ASCII_RUN.sub(lambda m: m.group().translate(_CLEAN_TABLE), text)
+    # Lowercase and drop anything that is not a-z, 0-9 or whitespace in
+    # one pass, then collapse whitespace runs (split/join also strips)
+    return ' '.join(text.translate(_CLEAN_TABLE).split())
 
 
 def print_slowly(text, delay=PRINT_DELAY):
-    """Prints text one character at a time to be human-readable."""
-    for char in text:
-        sys.stdout.write(char)
+    """
+    Prints text one word at a time to be human-readable.
+    Each word is written and flushed in one go, then we sleep for
+    `delay` per character so the overall pace stays the same.
+    When stdout is not a terminal the text is printed in one go.
+    """
+    # Piped or redirected output has nobody watching it scroll, so skip
+    # the per-word flush and sleep entirely
+    if not sys.stdout.isatty():
+        print(text)
+        return
+
+    chunks = text.split(' ')
+    last = len(chunks) - 1
+    for i, chunk in enumerate(chunks):
+        if i < last:
+            chunk += ' '
+        sys.stdout.write(chunk)
         sys.stdout.flush()
-        time.sleep(delay)
+        time.sleep(delay * len(chunk))
     print()
 
 
+@lru_cache(maxsize=65536)
 def estimate_syllables(word):
     """
     Estimates the number of syllables in a single word using a
     simple rule-based (heuristic) approach.
+    The word must already be cleaned (lowercase, no surrounding
+    whitespace), as every word taken from clean_text() output is.
     """
-    word = word.lower().strip()
-    
-    if not word or not re.search(r'[a-z]', word):
+    word = word.encode('ascii', 'ignore')
+
+    # bytes.islower() is only True if there is at least one a-z letter
+    if not word.islower():
         return 0
-        
     if len(word) <= 3:
         return 1
-        
-    if word.endswith('e'):
-        if not (word.endswith('le') and re.search(r'[^aeiouy]le$', word)):
+
+    # Drop a silent 'e' (0x65) unless the word ends in consonant + 'le' (0x6c)
+    if word[-1] == 0x65:
+        if not (word[-2] == 0x6c and not _VOWEL_MASK[word[-3]]):
             word = word[:-1]
 
-    vowel_groups = re.findall(r'[aeiouy]+', word)
-    count = len(vowel_groups)
-    
+    # Count non-vowel -> vowel transitions, one per vowel group
+    count = 0
+    prev = 0
+    for c in word:
+        v = _VOWEL_MASK[c]
+        count += v & ~prev
+        prev = v
+
     if count == 0:
         return 1
-        
     return count
 
 
@@ -79,6 +152,7 @@ def randomly_reduce_and_lineate_text(text, percentage_to_keep):
     """
     Reduces text by sampling words and formats them into
     lines based on a target syllable count.
+    Not thread-safe: the output is built in a shared buffer.
     """
     words = text.split()
 
@@ -91,25 +165,30 @@ def randomly_reduce_and_lineate_text(text, percentage_to_keep):
 
     sampled_words = random.sample(words, k)
     
-    all_lines = []
-    current_line_words = []
-    current_line_syllables = 0
-    
-    for word in sampled_words:
-        word_syllables = estimate_syllables(word)
+    # Words and separators are streamed into the shared _BUF,
+    # emptied first so it can be reused between calls
+    buf = _BUF
+    buf.seek(0)
+    buf.truncate(0)
+    write = buf.write
     
+    # Count syllables for all sampled words in one bulk map()
+    syllable_counts = map(estimate_syllables, sampled_words)
+    pairs = zip(sampled_words, syllable_counts)
+    # The first word always opens the first line, so it is written before
+    # the loop and the loop never has to check for an empty buffer
+    word, current_line_syllables = next(pairs)
+    write(word)
+    for word, word_syllables in pairs:
         if (current_line_syllables + word_syllables > TARGET_SYLLABLES_PER_LINE) and (current_line_syllables > 0):
-            all_lines.append(' '.join(current_line_words))
-            current_line_words = [word]
+            write('\n')
             current_line_syllables = word_syllables
         else:
-            current_line_words.append(word)
+            write(' ')
             current_line_syllables += word_syllables
+        write(word)
     
-    if current_line_words:
-         all_lines.append(' '.join(current_line_words))
-    
-    return '\n'.join(all_lines)
+    return buf.getvalue()
 
 
 # --- Main execution ---
@@ -146,16 +225,12 @@ if __name__ == "__main__":
     time.sleep(1)  # Shorter pause
 
     # 5. Calculate biased reduction based on text length
-    normalized_length = (text_length - REFERENCE_SHORT_LENGTH) / \
-                        (REFERENCE_LONG_LENGTH - REFERENCE_SHORT_LENGTH)
+    normalized_length = (text_length - REFERENCE_SHORT_LENGTH) * _LEN_SCALE
     
     length_factor = max(0.0, min(1.0, normalized_length)) # Clamp between 0.0 and 1.0
 
-    current_min_keep = (SHORT_TEXT_MIN_KEEP * (1 - length_factor)) + \
-                       (LONG_TEXT_MIN_KEEP * length_factor)
-                       
-    current_max_keep = (SHORT_TEXT_MAX_KEEP * (1 - length_factor)) + \
-                       (LONG_TEXT_MAX_KEEP * length_factor)
+    current_min_keep = SHORT_TEXT_MIN_KEEP + length_factor * _MIN_DELTA
+    current_max_keep = SHORT_TEXT_MAX_KEEP + length_factor * _MAX_DELTA
     
     # 6. Pick a random percentage from within the new biased range
     random_keep_percentage = random.uniform(current_min_keep, current_max_keep)
@@ -184,16 +259,25 @@ if __name__ == "__main__":
         # Make sure we don't try to pick more words than exist
         num_words = min(num_words, len(source_words_list)) 
         
-        # Randomly sample that many words
-        title_words = random.sample(source_words_list, num_words)
+        # Randomly sample that many words: for at most 4 picks, drawing
+        # indices and skipping repeats beats random.sample's setup
+        n = len(source_words_list)
+        picks = []
+        while len(picks) < num_words:
+            i = random.randrange(n)
+            if i not in picks:
+                picks.append(i)
+        title_words = [source_words_list[i] for i in picks]
         
         # Join with underscores and add .txt extension
         output_filename = '_'.join(title_words) + ".txt"
 
     # 10. Write the reduced text to the new file
     try:
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            f.write(reduced_text)
+        # Encode once and write the bytes through a large buffer, skipping
+        # the text layer (the poem is plain ASCII, so UTF-8 is a copy)
+        with open(output_filename, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(reduced_text.encode('utf-8'))
         
         # This message now appears *after* the slow-print is finished
         print(f"\nSuccessfully saved poem to: {output_filename}")
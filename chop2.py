@@ -4,11 +4,26 @@ import sys
 import argparse  # <-- Import the new module
 
 def print_slowly(text, delay=0.01):
-    """Prints text one character at a time to be human-readable."""
-    for char in text:
-        sys.stdout.write(char)
+    """
+    Prints text one word at a time to be human-readable.
+    Each word is written and flushed in one go, then we sleep for
+    `delay` per character so the overall pace stays the same.
+    When stdout is not a terminal the text is printed in one go.
+    """
+    # Piped or redirected output has nobody watching it scroll, so skip
+    # the per-word flush and sleep entirely
+    if not sys.stdout.isatty():
+        print(text)
+        return
+
+    chunks = text.split(' ')
+    last = len(chunks) - 1
+    for i, chunk in enumerate(chunks):
+        if i < last:
+            chunk += ' '
+        sys.stdout.write(chunk)
         sys.stdout.flush()
-        time.sleep(delay)
+        time.sleep(delay * len(chunk))
     print() 
 
 def randomly_reduce_and_lineate_text(text, percentage_to_keep):
@@ -33,9 +48,17 @@ def randomly_reduce_and_lineate_text(text, percentage_to_keep):
     min_words_per_line = 3
     max_words_per_line = 7
     
+    # Draw every line length up front in one call (enough for the
+    # worst case where each line is min_words_per_line long)
+    line_lengths = random.choices(
+        range(min_words_per_line, max_words_per_line + 1),
+        k=len(sampled_words) // min_words_per_line + 1,
+    )
+    
     i = 0
-    while i < len(sampled_words):
-        line_length = random.randint(min_words_per_line, max_words_per_line)
+    for line_length in line_lengths:
+        if i >= len(sampled_words):
+            break
         line_words = sampled_words[i : i + line_length]
         lineated_text_lines.append(' '.join(line_words))
         i += line_length
@@ -1,9 +1,11 @@
 import random
-import re
 import argparse
 import os
-import glob
 import base64
+import io
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 
 # --- Constants for Configuration ---
 REFERENCE_SHORT_LENGTH = 1000
@@ -12,36 +14,113 @@ SHORT_TEXT_MIN_KEEP = 0.08  # Minimum for short texts (allows variation up to 10
 SHORT_TEXT_MAX_KEEP = 0.10  # Maximum 10% for short texts
 LONG_TEXT_MIN_KEEP = 0.01   # Minimum 1% for long texts
 LONG_TEXT_MAX_KEEP = 0.02   # Maximum for long texts (biased toward lower retention)
+READ_CHUNK_SIZE = 1 << 20   # Characters read (and cleaned) at a time from input files
+WRITE_BUFFER_SIZE = 1 << 20 # Buffer size for output files
+
+# Pre-computed terms for the length bias (see calculate_biased_retention)
+_LEN_SCALE = 1.0 / (REFERENCE_LONG_LENGTH - REFERENCE_SHORT_LENGTH)
+_MIN_DELTA = LONG_TEXT_MIN_KEEP - SHORT_TEXT_MIN_KEEP
+_MAX_DELTA = LONG_TEXT_MAX_KEEP - SHORT_TEXT_MAX_KEEP
+
+
+_CLEAN_KEEP = 'abcdefghijklmnopqrstuvwxyz'
+
+
+class _CleanTable(dict):
+    """
+    str.translate() table for clean_text: lowercases A-Z, keeps a-z
+    and whitespace, deletes everything else. Characters not listed up
+    front are classified on first lookup and cached. Non-ASCII whitespace
+    becomes a plain space, so every value is ASCII.
+    """
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        if char.isspace():
+            value = codepoint if codepoint < 0x80 else 0x20
+        else:
+            # Same result as lower() followed by stripping; a few non-ASCII
+            # letters lowercase to ASCII ones (e.g. the Kelvin sign -> 'k')
+            value = ''.join(c for c in char.lower() if c in _CLEAN_KEEP) or None
+        self[codepoint] = value
+        return value
+
+
+_CLEAN_TABLE = _CleanTable({ord(c): ord(c) for c in _CLEAN_KEEP})
+_CLEAN_TABLE.update({ord(c.upper()): ord(c) for c in _CLEAN_KEEP if c.isalpha()})
+
+# Runs of non-ASCII characters, cleaned separately by clean_text
+_NON_ASCII_RUN = re.compile(r'[^\x00-\x7f]+')
+
+# Lookup table indexed by byte value: 1 for a vowel (aeiouy), 0 otherwise
+_VOWEL_MASK = bytes(1 if c in b'aeiouy' else 0 for c in range(256))
+
+# Output buffer reused by create_broken_sentence_text so repeated calls
+# don't allocate a new one each time (not thread-safe)
+_BUF = io.StringIO()
+
+
+def _translate_clean(text):
+    """
+    Lowercases text and drops anything that is not a-z or whitespace,
+    leaving whitespace runs as they are.
+    """
+    # str.translate() only takes its fast path on pure-ASCII strings, and
+    # a few curly quotes or dashes would push the whole text off it, so
+    # clean the non-ASCII runs on their own first (they come out ASCII)
+    if not text.isascii():
+        text = _NON_ASCII_RUN.sub(lambda m: m.group().translate(_CLEAN_TABLE), text)
+    return text.translate(_CLEAN_TABLE)
 
 
 def clean_text(text):
     """
     Converts text to lowercase and removes all special characters and numbers.
     """
-    text = text.lower()
-    text = re.sub(r'[^a-z\s]', '', text)  # Keep only letters and space
-    text = re.sub(r'\s+', ' ', text).strip()  # Collapse multiple spaces
-    return text
+    # Clean in one pass, then collapse whitespace runs (split/join also strips)
+    return ' '.join(_translate_clean(text).split())
+
 
+def read_clean_text(input_file):
+    """
+    Reads a text file and returns it cleaned, same as clean_text().
+    The file is read and translated in chunks so the raw text is never
+    held in memory in full next to its cleaned copy.
+    """
+    with open(input_file, 'r', encoding='utf-8', buffering=READ_CHUNK_SIZE) as f:
+        parts = [_translate_clean(chunk)
+                 for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), '')]
+    # Whitespace runs can span chunk boundaries, so collapse after joining
+    return ' '.join(''.join(parts).split())
 
+
+@lru_cache(maxsize=65536)
 def estimate_syllables(word):
     """
     Estimates the number of syllables in a single word.
+    The word must already be cleaned (lowercase, no surrounding
+    whitespace), as every word taken from clean_text() output is.
     """
-    word = word.lower().strip()
-    
-    if not word or not re.search(r'[a-z]', word):
+    word = word.encode('ascii', 'ignore')
+
+    # bytes.islower() is only True if there is at least one a-z letter
+    if not word.islower():
         return 0
     if len(word) <= 3:
         return 1
-        
-    if word.endswith('e'):
-        if not (word.endswith('le') and re.search(r'[^aeiouy]le$', word)):
+
+    # Drop a silent 'e' (0x65) unless the word ends in consonant + 'le' (0x6c)
+    if word[-1] == 0x65:
+        if not (word[-2] == 0x6c and not _VOWEL_MASK[word[-3]]):
             word = word[:-1]
 
-    vowel_groups = re.findall(r'[aeiouy]+', word)
-    count = len(vowel_groups)
-    
+    # Count non-vowel -> vowel transitions, one per vowel group
+    count = 0
+    prev = 0
+    for c in word:
+        v = _VOWEL_MASK[c]
+        count += v & ~prev
+        prev = v
+
     if count == 0:
         return 1
     return count
@@ -82,9 +161,9 @@ def create_broken_sentence_text_with_flicker(text, percentage_to_keep, min_sylla
     current_line_words = []
     current_line_syllables = 0
     
-    for word in sampled_words:
-        word_syllables = estimate_syllables(word)
-        
+    # Count syllables for all sampled words in one bulk map()
+    syllable_counts = map(estimate_syllables, sampled_words)
+    for word, word_syllables in zip(sampled_words, syllable_counts):
         # Check if adding this word would exceed max_syllables
         if (current_line_syllables + word_syllables > max_syllables) and (current_line_syllables >= min_syllables):
             # Current line has enough syllables, start a new line
@@ -209,6 +288,7 @@ def create_broken_sentence_text(text, percentage_to_keep, min_syllables=6, max_s
     """
     Highly reduces text by sampling words and formats them into lines with 6-12 syllables.
     Words remain lowercase with no punctuation.
+    Not thread-safe: the output is built in a shared buffer.
     """
     words = text.split()
 
@@ -223,30 +303,33 @@ def create_broken_sentence_text(text, percentage_to_keep, min_syllables=6, max_s
     # Sample words randomly
     sampled_words = random.sample(words, k)
     
-    # Group words into lines based on syllable count (6-12 syllables per line)
-    all_lines = []
-    current_line_words = []
-    current_line_syllables = 0
+    # Group words into lines based on syllable count (6-12 syllables per line),
+    # streaming words and separators into the shared _BUF (emptied first)
+    buf = _BUF
+    buf.seek(0)
+    buf.truncate(0)
+    write = buf.write
     
-    for word in sampled_words:
-        word_syllables = estimate_syllables(word)
-        
+    # Count syllables for all sampled words in one bulk map()
+    syllable_counts = map(estimate_syllables, sampled_words)
+    pairs = zip(sampled_words, syllable_counts)
+    # The first word always opens the first line, so it is written before
+    # the loop and the loop never has to check for an empty buffer
+    word, current_line_syllables = next(pairs)
+    write(word)
+    for word, word_syllables in pairs:
         # Check if adding this word would exceed max_syllables
         if (current_line_syllables + word_syllables > max_syllables) and (current_line_syllables >= min_syllables):
             # Current line has enough syllables, start a new line
-            all_lines.append(' '.join(current_line_words))
-            current_line_words = [word]
+            write('\n')
             current_line_syllables = word_syllables
         else:
             # Add to current line
-            current_line_words.append(word)
+            write(' ')
             current_line_syllables += word_syllables
+        write(word)
     
-    # Add the last line if it has any content
-    if current_line_words:
-        all_lines.append(' '.join(current_line_words))
-    
-    return '\n'.join(all_lines)
+    return buf.getvalue()
 
 
 def calculate_biased_retention(text_length, fixed_retention=None):
@@ -261,29 +344,43 @@ def calculate_biased_retention(text_length, fixed_retention=None):
         return fixed_retention
     
     # Normalize text length between reference points
-    normalized_length = (text_length - REFERENCE_SHORT_LENGTH) / \
-                        (REFERENCE_LONG_LENGTH - REFERENCE_SHORT_LENGTH)
+    normalized_length = (text_length - REFERENCE_SHORT_LENGTH) * _LEN_SCALE
     length_factor = max(0.0, min(1.0, normalized_length))  # Clamp between 0.0 and 1.0
     
     # Interpolate between short and long text retention ranges
-    current_min_keep = (SHORT_TEXT_MIN_KEEP * (1 - length_factor)) + \
-                       (LONG_TEXT_MIN_KEEP * length_factor)
-    current_max_keep = (SHORT_TEXT_MAX_KEEP * (1 - length_factor)) + \
-                       (LONG_TEXT_MAX_KEEP * length_factor)
+    current_min_keep = SHORT_TEXT_MIN_KEEP + length_factor * _MIN_DELTA
+    current_max_keep = SHORT_TEXT_MAX_KEEP + length_factor * _MAX_DELTA
     
     # Pick a random percentage from within the biased range
     random_keep_percentage = random.uniform(current_min_keep, current_max_keep)
     return random_keep_percentage
 
 
+def find_text_files(directory=None):
+    """
+    Lists the .txt files in a directory (default: the current one),
+    largest first so the big files start early when run in parallel.
+    Hidden files are skipped, as glob("*.txt") would.
+    """
+    with os.scandir(directory or '.') as entries:
+        found = [entry for entry in entries
+                 if entry.name.endswith('.txt') and not entry.name.startswith('.')
+                 and entry.is_file()]
+    found.sort(key=lambda entry: entry.stat().st_size, reverse=True)
+    # Keep bare names for the current directory, like glob("*.txt") did
+    if directory is None:
+        return [entry.name for entry in found]
+    return [entry.path for entry in found]
+
+
 def process_file(input_file, output_dir=None, fixed_retention=None):
     """
     Process a single text file and create broken-line sentence output.
     If fixed_retention is None, calculates biased retention based on text length.
     """
+    # Read and clean the text
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            original_text = f.read()
+        cleaned_text = read_clean_text(input_file)
     except FileNotFoundError:
         print(f"Error: The file '{input_file}' was not found.")
         return None
@@ -291,9 +388,6 @@ def process_file(input_file, output_dir=None, fixed_retention=None):
         print(f"An error occurred while reading the file: {e}")
         return None
 
-    # Clean the text
-    cleaned_text = clean_text(original_text)
-    
     if not cleaned_text.strip():
         print(f"Warning: '{input_file}' had no words after cleaning.")
         return None
@@ -319,8 +413,10 @@ def process_file(input_file, output_dir=None, fixed_retention=None):
     
     # Write output
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(broken_text)
+        # Encode once and write the bytes through a large buffer, skipping
+        # the text layer (the output is plain ASCII, so UTF-8 is a copy)
+        with open(output_file, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(broken_text.encode('utf-8'))
         num_lines = len(broken_text.splitlines())
         print(f"Created: {output_file} ({num_lines} lines, {reduction_percentage:.0f}% reduction)")
         return output_file
@@ -365,7 +461,7 @@ if __name__ == "__main__":
     
     if args.all:
         # Process all .txt files in current directory
-        files_to_process = glob.glob("*.txt")
+        files_to_process = find_text_files()
         if not files_to_process:
             print("No .txt files found in current directory.")
             exit(1)
@@ -375,7 +471,7 @@ if __name__ == "__main__":
                 print(f"Warning: '{args.input}' is not a .txt file. Processing anyway...")
             files_to_process = [args.input]
         elif os.path.isdir(args.input):
-            files_to_process = glob.glob(os.path.join(args.input, "*.txt"))
+            files_to_process = find_text_files(args.input)
             if not files_to_process:
                 print(f"No .txt files found in directory '{args.input}'.")
                 exit(1)
@@ -394,8 +490,15 @@ if __name__ == "__main__":
         print(f"Processing {len(files_to_process)} file(s) with biased random retention (10%%-1%%)...")
     print("-" * 50)
     
-    for file_path in files_to_process:
-        process_file(file_path, args.output_dir, args.keep)
+    if len(files_to_process) > 1:
+        # Files are independent, so spread them over all cores. Each worker
+        # reseeds from os.urandom, otherwise forked workers would share the
+        # parent's random state and produce matching poems.
+        worker = partial(process_file, output_dir=args.output_dir, fixed_retention=args.keep)
+        with ProcessPoolExecutor(initializer=random.seed) as executor:
+            list(executor.map(worker, files_to_process))
+    else:
+        process_file(files_to_process[0], args.output_dir, args.keep)
     
     print("-" * 50)
     print("Done!")
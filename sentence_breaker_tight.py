@@ -4,6 +4,10 @@ import argparse
 import os
 import glob
 import base64
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 
 # --- Constants for Configuration ---
 REFERENCE_SHORT_LENGTH = 1000
@@ -22,143 +26,50 @@ MULTIPLIER_MIN = 1.0  # Reduced from 3.0 to get more lines
 MULTIPLIER_MAX = 1.67  # Reduced from 5.0 (approximately 5/3) to get more lines
 
 
-def clean_text(text):
-    """
-    Converts text to lowercase and removes all special characters and numbers.
-    """
-    text = text.lower()
-    text = re.sub(r'[^a-z\s]', '', text)  # Keep only letters and space
-    text = re.sub(r'\s+', ' ', text).strip()  # Collapse multiple spaces
-    return text
-
-
-def estimate_syllables(word):
-    """
-    Estimates the number of syllables in a single word.
-    """
-    word = word.lower().strip()
-    
-    if not word or not re.search(r'[a-z]', word):
-        return 0
-    if len(word) <= 3:
-        return 1
-        
-    if word.endswith('e'):
-        if not (word.endswith('le') and re.search(r'[^aeiouy]le$', word)):
-            word = word[:-1]
-
-    vowel_groups = re.findall(r'[aeiouy]+', word)
-    count = len(vowel_groups)
-    
-    if count == 0:
-        return 1
-    return count
-
-
-def encrypt_word(word):
-    """
-    Encrypts a word using a simple cipher (ROT13-like with base64 encoding).
-    """
-    if not word:
-        return ""
-    # Use base64 encoding for encryption effect
-    encoded = base64.b64encode(word.encode()).decode()
-    # Truncate to similar length for visual effect
-    return encoded[:len(word) + 2] if len(encoded) > len(word) else encoded
+_CLEAN_KEEP = 'abcdefghijklmnopqrstuvwxyz'
 
 
-def get_random_line_syllable_limits():
+class _CleanTable(dict):
     """
-    Returns random min and max syllable limits that are 3-5x the base range.
-    Each call returns different values for variation.
+    str.translate() table for clean_text: lowercases A-Z, keeps a-z
+    and whitespace, deletes everything else. Characters not listed up
+    front are classified on first lookup and cached. Non-ASCII whitespace
+    becomes a plain space, so every value is ASCII.
     """
-    multiplier = random.uniform(MULTIPLIER_MIN, MULTIPLIER_MAX)
-    min_syllables = int(BASE_MIN_SYLLABLES * multiplier)
-    max_syllables = int(BASE_MAX_SYLLABLES * multiplier)
-    # Add some additional random fluctuation (±10%)
-    min_fluctuation = int(min_syllables * 0.1)
-    max_fluctuation = int(max_syllables * 0.1)
-    min_syllables += random.randint(-min_fluctuation, min_fluctuation)
-    max_syllables += random.randint(-max_fluctuation, max_fluctuation)
-    # Ensure min is always less than max and both are positive
-    min_syllables = max(1, min_syllables)
-    max_syllables = max(min_syllables + 1, max_syllables)
-    return min_syllables, max_syllables
-
-
-def create_broken_sentence_text_with_flicker(text, percentage_to_keep):
-    """
-    Creates text with alternating original and encrypted words for flickering effect.
-    Returns HTML with CSS animation. Uses line-based layout with 2-3x spacing, centered, and more lines.
-    """
-    words = text.split()
-
-    if not words:
-        return ""
-
-    # Calculate how many words to keep (increase to get more lines)
-    k = int(len(words) * percentage_to_keep)
-    if k == 0 and len(words) > 0:
-        k = 1  # Ensure we keep at least one word
-
-    # Sample words randomly
-    sampled_words = random.sample(words, k)
-    
-    # Group words into lines based on syllable count with random fluctuation
-    # Increase line length 3x
-    all_lines = []
-    current_line_words = []
-    current_line_syllables = 0
-    # Increase syllable limits 3x (from 3-8 to 9-24)
-    min_syllables, max_syllables = 9, 24  # Longer lines
-    
-    for word in sampled_words:
-        word_syllables = estimate_syllables(word)
-        
-        # Check if adding this word would exceed max_syllables
-        if (current_line_syllables + word_syllables > max_syllables) and (current_line_syllables >= min_syllables):
-            # Current line has enough syllables, start a new line
-            all_lines.append(current_line_words)
-            current_line_words = [word]
-            current_line_syllables = word_syllables
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        if char.isspace():
+            value = codepoint if codepoint < 0x80 else 0x20
         else:
-            # Add to current line
-            current_line_words.append(word)
-            current_line_syllables += word_syllables
-    
-    # Add the last line if it has any content
-    if current_line_words:
-        all_lines.append(current_line_words)
-    
-    # Create HTML with flickering effect, centered with 2-3x line spacing
-    html_lines = []
-    for line_index, line_words in enumerate(all_lines):
-        word_elements = []
-        # Alternate direction per line: even lines forward (1), odd lines reverse (-1)
-        flicker_direction = 1 if line_index % 2 == 0 else -1
-        
-        for i, word in enumerate(line_words):
-            encrypted = encrypt_word(word)
-            # Start with original for forward, encrypted for reverse
-            start_with_original = (flicker_direction == 1)
-            initial_text = word if start_with_original else encrypted
-            # Slower intervals: 2000-4000ms instead of 800-2000ms
-            delay = i * 0.2  # Small stagger per word in line
-            interval = random.uniform(2000, 4000)  # Slower interval between 2000-4000ms
-            
-            word_elements.append(
-                f'<span class="flicker-word" data-original="{word}" data-encrypted="{encrypted}" '
-                f'data-start-original="{str(start_with_original).lower()}" '
-                f'data-direction="{flicker_direction}" '
-                f'data-interval="{interval}" '
-                f'style="animation-delay: {delay}s;">{initial_text}</span>'
-            )
-        html_lines.append('<div class="flicker-line">' + ' '.join(word_elements) + '</div>')
-    
-    # Reduced line spacing multiplier (0.3-0.5x) - significantly decreased but prevents overlap
-    line_spacing_multiplier = random.uniform(0.3, 0.5)
-    
-    html_content = f"""<!DOCTYPE html>
+            # Same result as lower() followed by stripping; a few non-ASCII
+            # letters lowercase to ASCII ones (e.g. the Kelvin sign -> 'k')
+            value = ''.join(c for c in char.lower() if c in _CLEAN_KEEP) or None
+        self[codepoint] = value
+        return value
+
+
+_CLEAN_TABLE = _CleanTable({ord(c): ord(c) for c in _CLEAN_KEEP})
+_CLEAN_TABLE.update({ord(c.upper()): ord(c) for c in _CLEAN_KEEP if c.isalpha()})
+
+# Runs of non-ASCII characters, cleaned separately by clean_text
+_NON_ASCII_RUN = re.compile(r'[^\x00-\x7f]+')
+
+# Lookup table indexed by byte value: 1 for a vowel (aeiouy), 0 otherwise
+_VOWEL_MASK = bytes(1 if c in b'aeiouy' else 0 for c in range(256))
+
+# Constant pieces of a flicker-word <span>, in order. Only data-encrypted
+# is kept as an attribute (the CSS ::before reads it); each word's original
+# text and interval go in the window.__W payload at the end of the page
+_SPAN_OPEN = '<span class="flicker-word" data-encrypted="'
+_SPAN_STYLE = '" style="animation-delay: '
+_SPAN_TEXT = 's;">'
+_SPAN_CLOSE = '</span>'
+
+# Page wrapped around the flicker lines by write_broken_sentence_html, split
+# around the body. Both are str.format() templates: _HTML_HEAD takes
+# {line_margin} and {line_height} (literal braces are doubled), _HTML_TAIL
+# takes the {words} payload
+_HTML_HEAD = """<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -189,8 +100,8 @@ def create_broken_sentence_text_with_flicker(text, percentage_to_keep):
             text-align: center;
         }}
         .flicker-line {{
-            margin: {line_spacing_multiplier * 0.5}em 0;
-            line-height: {max(1.0, line_spacing_multiplier * 0.8)};
+            margin: {line_margin}em 0;
+            line-height: {line_height};
             min-height: 1.2em; /* Ensure minimum height to prevent overlap */
         }}
         .flicker-word {{
@@ -232,10 +143,10 @@ def create_broken_sentence_text_with_flicker(text, percentage_to_keep):
         // Enhanced flickering with random switching between original and encrypted
         document.addEventListener('DOMContentLoaded', function() {{
             const words = document.querySelectorAll('.flicker-word');
-            words.forEach((word) => {{
-                const original = word.getAttribute('data-original');
+            words.forEach((word, i) => {{
+                // window.__W holds [original, interval] per word, in document order
+                const [original, interval] = window.__W[i];
                 const encrypted = word.getAttribute('data-encrypted');
-                const interval = parseInt(word.getAttribute('data-interval'));
                 
                 setInterval(() => {{
                     // Randomly choose between original and encrypted
@@ -247,12 +158,203 @@ def create_broken_sentence_text_with_flicker(text, percentage_to_keep):
 </head>
 <body>
     <div class="content-container">
-{''.join(html_lines)}
+"""
+_HTML_TAIL = """
     </div>
+    <script>window.__W = {words};</script>
 </body>
 </html>"""
+
+# Output buffer reused by create_broken_sentence_text so repeated calls
+# don't allocate a new one each time (not thread-safe)
+_BUF = io.StringIO()
+
+
+def clean_text(text):
+    """
+    Converts text to lowercase and removes all special characters and numbers.
+    """
+    # str.translate() only takes its fast path on pure-ASCII strings, and
+    # a few curly quotes or dashes would push the whole text off it, so
+    # clean the non-ASCII runs on their own first (they come out ASCII)
+    if not text.isascii():
+        text = _NON_ASCII_RUN.sub(lambda m: m.group().translate(_CLEAN_TABLE), text)
+    # Lowercase and drop anything that is not a-z or whitespace in one
+    # pass, then collapse whitespace runs (split/join also strips)
+    return ' '.join(text.translate(_CLEAN_TABLE).split())
+
+
+@lru_cache(maxsize=65536)
+def estimate_syllables(word):
+    """
+    Estimates the number of syllables in a single word.
+    """
+    word = word.lower().strip().encode('ascii', 'ignore')
+
+    # bytes.islower() is only True if there is at least one a-z letter
+    if not word.islower():
+        return 0
+    if len(word) <= 3:
+        return 1
+
+    # Drop a silent 'e' (0x65) unless the word ends in consonant + 'le' (0x6c)
+    if word[-1] == 0x65:
+        if not (word[-2] == 0x6c and not _VOWEL_MASK[word[-3]]):
+            word = word[:-1]
+
+    # Count non-vowel -> vowel transitions, one per vowel group
+    count = 0
+    prev = 0
+    for c in word:
+        v = _VOWEL_MASK[c]
+        count += v & ~prev
+        prev = v
+
+    if count == 0:
+        return 1
+    return count
+
+
+@lru_cache(maxsize=65536)
+def encrypt_word(word):
+    """
+    Encrypts a word using a simple cipher (ROT13-like with base64 encoding).
+    """
+    if not word:
+        return ""
+    # Use base64 encoding for encryption effect
+    encoded = base64.b64encode(word.encode()).decode()
+    # Truncate to similar length for visual effect
+    return encoded[:len(word) + 2] if len(encoded) > len(word) else encoded
+
+
+def get_random_line_syllable_limits():
+    """
+    Returns random min and max syllable limits that are 3-5x the base range.
+    Each call returns different values for variation.
+    """
+    multiplier = random.uniform(MULTIPLIER_MIN, MULTIPLIER_MAX)
+    min_syllables = int(BASE_MIN_SYLLABLES * multiplier)
+    max_syllables = int(BASE_MAX_SYLLABLES * multiplier)
+    # Add some additional random fluctuation (±10%)
+    min_fluctuation = int(min_syllables * 0.1)
+    max_fluctuation = int(max_syllables * 0.1)
+    min_syllables += random.randint(-min_fluctuation, min_fluctuation)
+    max_syllables += random.randint(-max_fluctuation, max_fluctuation)
+    # Ensure min is always less than max and both are positive
+    min_syllables = max(1, min_syllables)
+    max_syllables = max(min_syllables + 1, max_syllables)
+    return min_syllables, max_syllables
+
+
+@lru_cache(maxsize=256)
+def _build_html_header(spacing_multiplier):
+    """
+    Returns the page head (everything before the flicker lines) for the
+    given line spacing multiplier.
+    """
+    return _HTML_HEAD.format(
+        line_margin=spacing_multiplier * 0.5,
+        line_height=max(1.0, spacing_multiplier * 0.8),
+    )
+
+
+def write_broken_sentence_html(text, percentage_to_keep, fp):
+    """
+    Writes the flickering HTML page for text to the open text file fp, with
+    alternating original and encrypted words. Uses line-based layout with
+    2-3x spacing, centered, and more lines. Each line is written as soon as
+    it is finished, so the page is never held in memory whole.
+    Returns the number of lines written (0 if the text has no words).
+    """
+    words = text.split()
+
+    if not words:
+        return 0
+
+    # Calculate how many words to keep (increase to get more lines)
+    k = int(len(words) * percentage_to_keep)
+    if k == 0 and len(words) > 0:
+        k = 1  # Ensure we keep at least one word
+
+    # Sample words randomly
+    sampled_words = random.sample(words, k)
+    
+    # Reduced line spacing multiplier (0.3-0.5x) - significantly decreased but prevents overlap.
+    # Rounded to 2 decimals so there are only 21 possible page heads, all cached
+    line_spacing_multiplier = round(random.uniform(0.3, 0.5), 2)
+    
+    write = fp.write
+    write(_build_html_header(line_spacing_multiplier))
     
-    return html_content
+    # Group words into lines based on syllable count with random fluctuation,
+    # collecting each line's HTML fragments and writing them out in one go
+    # when the line ends. Increase line length 3x
+    parts = ['<div class="flicker-line">']
+    append = parts.append
+    extend = parts.extend
+    # [original, interval] per word, written once as JSON after the lines
+    flicker_data = []
+    add_data = flicker_data.append
+    # random.uniform() is a Python-level wrapper, so the per-word interval
+    # is computed from random.random() directly (same formula, same value)
+    rand = random.random
+    current_line_syllables = 0
+    num_lines = 1
+    # Alternate direction per line: even lines forward, odd lines reverse
+    forward = True
+    i = 0  # Position of the word within its line
+    # Increase syllable limits 3x (from 3-8 to 9-24)
+    min_syllables, max_syllables = 9, 24  # Longer lines
+    
+    for word in sampled_words:
+        word_syllables = estimate_syllables(word)
+        
+        # Check if adding this word would exceed max_syllables
+        if (current_line_syllables + word_syllables > max_syllables) and (current_line_syllables >= min_syllables):
+            # Current line has enough syllables, write it and start a new line
+            write(''.join(parts))
+            parts.clear()
+            append('</div><div class="flicker-line">')
+            num_lines += 1
+            forward = not forward
+            i = 0
+            current_line_syllables = 0
+        elif i:
+            # Add to current line
+            append(' ')
+        current_line_syllables += word_syllables
+        
+        encrypted = encrypt_word(word)
+        # Slower intervals: 2000-4000ms instead of 800-2000ms
+        delay = i * 0.2  # Small stagger per word in line
+        # Slower interval between 2000-4000ms, whole ms (the page's JS
+        # used to parseInt() it anyway)
+        add_data((word, int(2000 + 2000 * rand())))
+        
+        # Start with original for forward, encrypted for reverse
+        extend((
+            _SPAN_OPEN, encrypted, _SPAN_STYLE, repr(delay), _SPAN_TEXT,
+            word if forward else encrypted, _SPAN_CLOSE,
+        ))
+        i += 1
+    append('</div>')
+    write(''.join(parts))
+    
+    write(_HTML_TAIL.format(words=json.dumps(flicker_data, separators=(',', ':'))))
+    return num_lines
+
+
+def create_broken_sentence_text_with_flicker(text, percentage_to_keep):
+    """
+    Creates text with alternating original and encrypted words for flickering effect.
+    Returns HTML with CSS animation. Uses line-based layout with 2-3x spacing, centered, and more lines.
+    """
+    if not text.split():
+        return ""
+    out = io.StringIO()
+    write_broken_sentence_html(text, percentage_to_keep, out)
+    return out.getvalue()
 
 
 def generate_title_filename(cleaned_text, input_filename):
@@ -277,6 +379,7 @@ def create_broken_sentence_text(text, percentage_to_keep):
     """
     Highly reduces text by sampling words and formats them into lines with 3-5x longer syllables.
     Words remain lowercase with no punctuation.
+    Not thread-safe: the output is built in a shared buffer.
     """
     words = text.split()
 
@@ -291,33 +394,37 @@ def create_broken_sentence_text(text, percentage_to_keep):
     # Sample words randomly
     sampled_words = random.sample(words, k)
     
-    # Group words into lines based on syllable count with random fluctuation
-    all_lines = []
-    current_line_words = []
-    current_line_syllables = 0
+    # Group words into lines based on syllable count with random fluctuation,
+    # streaming words and separators into the shared _BUF (emptied first)
+    buf = _BUF
+    buf.seek(0)
+    buf.truncate(0)
+    write = buf.write
     min_syllables, max_syllables = get_random_line_syllable_limits()
     
-    for word in sampled_words:
+    # The first word always opens the first line (min_syllables is at
+    # least 1), so it is written before the loop
+    remaining = iter(sampled_words)
+    word = next(remaining)
+    current_line_syllables = estimate_syllables(word)
+    write(word)
+    for word in remaining:
         word_syllables = estimate_syllables(word)
         
         # Check if adding this word would exceed max_syllables
         if (current_line_syllables + word_syllables > max_syllables) and (current_line_syllables >= min_syllables):
             # Current line has enough syllables, start a new line
-            all_lines.append(' '.join(current_line_words))
-            current_line_words = [word]
+            write('\n')
             current_line_syllables = word_syllables
             # Get new random limits for the next line
             min_syllables, max_syllables = get_random_line_syllable_limits()
         else:
             # Add to current line
-            current_line_words.append(word)
+            write(' ')
             current_line_syllables += word_syllables
+        write(word)
     
-    # Add the last line if it has any content
-    if current_line_words:
-        all_lines.append(' '.join(current_line_words))
-    
-    return '\n'.join(all_lines)
+    return buf.getvalue()
 
 
 def calculate_biased_retention(text_length, fixed_retention=None):
@@ -353,8 +460,10 @@ def process_file(input_file, output_dir=None, fixed_retention=None):
     If fixed_retention is None, calculates biased retention based on text length.
     """
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            original_text = f.read()
+        # One bulk read and a single decode, skipping the text layer
+        # (line endings are left as-is, clean_text treats \r as whitespace)
+        with open(input_file, 'rb') as f:
+            original_text = f.read().decode('utf-8')
     except FileNotFoundError:
         print(f"Error: The file '{input_file}' was not found.")
         return None
@@ -374,9 +483,6 @@ def process_file(input_file, output_dir=None, fixed_retention=None):
     percentage_to_keep = calculate_biased_retention(text_length, fixed_retention)
     reduction_percentage = (1 - percentage_to_keep) * 100
 
-    # Create the broken sentence text with flickering effect
-    broken_text = create_broken_sentence_text_with_flicker(cleaned_text, percentage_to_keep)
-    
     # Generate titled filename from the text
     title_base = generate_title_filename(cleaned_text, input_file).replace('.txt', '')
     title_filename = f"{title_base}.html"
@@ -388,11 +494,11 @@ def process_file(input_file, output_dir=None, fixed_retention=None):
     else:
         output_file = title_filename
     
-    # Write output
+    # Create the broken sentence text with flickering effect, written
+    # straight into the output file
     try:
         with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(broken_text)
-        num_lines = len(broken_text.split('<div class="flicker-line">')) - 1
+            num_lines = write_broken_sentence_html(cleaned_text, percentage_to_keep, f)
         print(f"Created: {output_file} ({num_lines} lines, {reduction_percentage:.0f}% reduction)")
         return output_file
     except Exception as e:
@@ -465,8 +571,15 @@ if __name__ == "__main__":
         print(f"Processing {len(files_to_process)} file(s) with biased random retention (30%%-3%%)...")
     print("-" * 50)
     
-    for file_path in files_to_process:
-        process_file(file_path, args.output_dir, args.keep)
+    if len(files_to_process) > 1:
+        # Files are independent, so spread them over all cores. Each worker
+        # reseeds from os.urandom, otherwise forked workers would share the
+        # parent's random state and produce matching poems.
+        worker = partial(process_file, output_dir=args.output_dir, fixed_retention=args.keep)
+        with ProcessPoolExecutor(initializer=random.seed) as executor:
+            list(executor.map(worker, files_to_process))
+    else:
+        process_file(files_to_process[0], args.output_dir, args.keep)
     
     print("-" * 50)
     print("Done!")